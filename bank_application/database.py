@@ -1,169 +1,534 @@
 import sqlite3
-import json
+import functools
 import hashlib
+import hmac
 import secrets
 import os
+import re
 import base64
+import binascii
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
 from datetime import datetime
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Heavier modules (logging, concurrent.futures, argon2, cryptography) are imported
+# on first use so importing this module stays cheap; typing.TYPE_CHECKING is
+# spelled out for the same reason
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import logging
+    from concurrent.futures import Future, ThreadPoolExecutor
+    from argon2 import PasswordHasher
+    from cryptography.fernet import Fernet
+
+
+@functools.cache
+def _logger() -> 'logging.Logger':
+    """Get the module logger"""
+    import logging
+    return logging.getLogger(__name__)
+
+
+def _pbkdf2_sha256(password: str, salt: bytes, iterations: int = 100_000) -> bytes:
+    """Derive a 32-byte PBKDF2-HMAC-SHA256 key in OpenSSL's native loop"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=32)
+
+
+# Columns of every card SELECT; they become the keys of the returned card dicts
+_CARD_COLUMNS = (
+    'id', 'bank_name', 'branch_name', 'ifsc_code', 'account_number', 'atm_number',
+    'pin', 'validity_start', 'validity_end', 'cvv', 'card_type', 'card_network',
+    'family_member', 'created_at', 'updated_at',
+)
+
+# SQL is kept in constants so sqlite3's statement cache reuses the compiled statements.
+# created_at/updated_at are stored as INTEGER nanoseconds in *_ns columns.
+_CREATE_CARDS_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bank_name TEXT NOT NULL,
+        branch_name TEXT NOT NULL,
+        ifsc_code TEXT NOT NULL,
+        account_number TEXT NOT NULL,
+        atm_number TEXT NOT NULL,
+        pin TEXT NOT NULL,
+        validity_start TEXT NOT NULL,
+        validity_end TEXT NOT NULL,
+        cvv TEXT NOT NULL,
+        card_type TEXT NOT NULL,
+        card_network TEXT NOT NULL,
+        family_member TEXT NOT NULL,
+        created_at_ns INTEGER NOT NULL,
+        updated_at_ns INTEGER NOT NULL
+    )
+'''
+_INSERT_SQL = '''
+    INSERT INTO bank_cards
+    (bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+     validity_start, validity_end, cvv, card_type, card_network,
+     family_member, created_at_ns, updated_at_ns)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SELECT_ALL_SQL = '''
+    SELECT id, bank_name, branch_name, ifsc_code, account_number, atm_number,
+           pin, validity_start, validity_end, cvv, card_type, card_network,
+           family_member, created_at_ns AS created_at, updated_at_ns AS updated_at
+    FROM bank_cards
+    ORDER BY created_at_ns DESC
+'''
+_SELECT_BY_ID_SQL = '''
+    SELECT id, bank_name, branch_name, ifsc_code, account_number, atm_number,
+           pin, validity_start, validity_end, cvv, card_type, card_network,
+           family_member, created_at_ns AS created_at, updated_at_ns AS updated_at
+    FROM bank_cards WHERE id = ?
+'''
+_UPDATE_SQL = '''
+    UPDATE bank_cards
+    SET bank_name=?, branch_name=?, ifsc_code=?, account_number=?, atm_number=?,
+        pin=?, validity_start=?, validity_end=?, cvv=?, card_type=?,
+        card_network=?, family_member=?, updated_at_ns=?
+    WHERE id=?
+'''
+_DELETE_SQL = 'DELETE FROM bank_cards WHERE id = ?'
+_SELECT_SECRETS_SQL = 'SELECT id, account_number, atm_number, pin, cvv FROM bank_cards'
+_UPDATE_SECRETS_SQL = '''
+    UPDATE bank_cards SET account_number=?, atm_number=?, pin=?, cvv=?
+    WHERE id=?
+'''
+_GET_SETTING_SQL = 'SELECT value FROM settings WHERE key = ?'
+_PUT_SETTING_SQL = 'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)'
+
+
+def _iso_to_ns(value: str) -> int:
+    """Convert a local-time ISO timestamp to nanoseconds since the epoch"""
+    return round(datetime.fromisoformat(value).timestamp() * 1_000_000) * 1000
+
+
+def _ns_to_iso(value: int) -> str:
+    """Convert nanoseconds since the epoch to a local-time ISO timestamp"""
+    return datetime.fromtimestamp(value / 1_000_000_000).isoformat(timespec='seconds')
+
+
+@functools.cache
+def _password_hasher() -> 'PasswordHasher':
+    """Get the argon2id master password hasher: 2 passes over 64 MiB, 2 lanes"""
+    from argon2 import PasswordHasher
+    return PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+
+# PBKDF2 iterations for the Fernet key of newly created vaults (OWASP 2023)
+_ENCRYPTION_ITERATIONS = 600_000
+
+
+@functools.cache
+def _kdf_executor() -> 'ThreadPoolExecutor':
+    """Get the executor that runs master-password key derivation off the caller's (GUI) thread"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=1)
+
+
+# Card number masks; concatenating around _MASK_MID skips f-string formatting
+_MASK_MID = " **** **** "
+_MASK_FULL = "**** **** **** ****"
+
+# Deletes every non-digit Latin-1 character in a single C-level pass
+_NON_DIGIT_TRANS = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not chr(c).isdigit()))
+# Never stricter than strptime's %Y-%m-%d, which also takes unpadded months and days
+_DATE_RE = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
+# Fernet tokens are urlsafe base64, padded with at most two '='
+_TOKEN_RE = re.compile(r'[A-Za-z0-9_-]+={0,2}')
+
+
+def _digits_only(value: str) -> str:
+    """Strip everything but digits from value"""
+    digits = value.translate(_NON_DIGIT_TRANS)
+    if digits.isascii():
+        return digits
+    # Characters outside Latin-1 aren't covered by the table
+    return ''.join(filter(str.isdigit, digits))
+
+
+def _is_fernet_token(value: str) -> bool:
+    """Check whether value is shaped like a Fernet token: base64url starting with version byte 0x80"""
+    if not _TOKEN_RE.fullmatch(value):
+        return False
+    try:
+        return base64.urlsafe_b64decode(value)[:1] == b'\x80'
+    except binascii.Error:
+        return False
+
+
+def _validate_rows(rows: list[tuple], start: int = 0) -> tuple[list[tuple], list[int]]:
+    """Clean and validate raw 13-column card rows read from Excel.
+
+    Returns the cleaned 12-field card tuples (without the ID column), in
+    add_card argument order, and the indexes of the rows that were rejected.
+    start offsets the row numbers used in log messages.
+    """
+    valid_rows = []
+    skipped_indices = []
+    for index, values in enumerate(rows):
+        (_, bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+         validity_start, validity_end, cvv, card_type, card_network,
+         family_member) = values
+        bank_name = str(bank_name or "").strip()
+        branch_name = str(branch_name or "").strip()
+        ifsc_code = str(ifsc_code or "").strip()
+        account_number = str(account_number or "").strip()
+        atm_number = str(atm_number or "").strip()
+        pin = str(pin or "").strip()
+        validity_start = str(validity_start or "").strip()
+        validity_end = str(validity_end or "").strip()
+        cvv = str(cvv or "").strip()
+        card_type = str(card_type or "Debit").strip()
+        card_network = str(card_network or "RuPay").strip()
+        family_member = str(family_member or "").strip()
+
+        # Validate required fields
+        if not all([bank_name, branch_name, ifsc_code, account_number, atm_number, pin, cvv, validity_start, validity_end, family_member]):
+            _logger().debug("Skipping row %d: missing required fields", index + start)
+            skipped_indices.append(index)
+            continue
+
+        # Clean account and ATM numbers (remove spaces)
+        account_number = _digits_only(account_number)
+        atm_number = _digits_only(atm_number)
+
+        # Validate ATM number length
+        if len(atm_number) != 16:
+            _logger().debug("Skipping row %d: ATM number is not 16 digits", index + start)
+            skipped_indices.append(index)
+            continue
+
+        # Validate date format, rejecting obviously malformed dates before strptime
+        if not (_DATE_RE.fullmatch(validity_start) and _DATE_RE.fullmatch(validity_end)):
+            _logger().debug("Skipping row %d: validity dates are not YYYY-MM-DD", index + start)
+            skipped_indices.append(index)
+            continue
+        try:
+            datetime.strptime(validity_start, "%Y-%m-%d")
+            datetime.strptime(validity_end, "%Y-%m-%d")
+        except ValueError:
+            _logger().debug("Skipping row %d: invalid validity date", index + start)
+            skipped_indices.append(index)
+            continue
+
+        valid_rows.append((
+            bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+            validity_start, validity_end, cvv, card_type, card_network, family_member
+        ))
+    return valid_rows, skipped_indices
+
 
 class CompleteDatabase:
     """Complete database with all features"""
 
     def __init__(self, master_password=None):
         self.master_password = master_password
+        # Fernet for master_password; PBKDF2 runs once per login, not per field
+        self._fernet = None
         # Use absolute path relative to the script location
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.db_path = os.path.join(base_dir, 'complete_bank_manager.db')
+        # A single writer connection (SQLite allows one writer at a time) plus
+        # a lazily opened read-only connection per thread, so readers don't
+        # queue behind writes under WAL
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []
+        self._conn = self._connect()
+        self._conn.execute('PRAGMA journal_mode=WAL')
         self._init_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open an autocommit connection with the per-connection pragmas applied"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read-only connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute('PRAGMA query_only=1')
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close the writer and all reader connections"""
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._local = threading.local()
+            # Refresh the query planner's statistics before letting go
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
+
     def _init_database(self):
         """Initialize database with all fields"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create settings table for password hash
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bank_cards (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                bank_name TEXT NOT NULL,
-                branch_name TEXT NOT NULL,
-                ifsc_code TEXT NOT NULL,
-                account_number TEXT NOT NULL,
-                atm_number TEXT NOT NULL,
-                pin TEXT NOT NULL,
-                validity_start TEXT NOT NULL,
-                validity_end TEXT NOT NULL,
-                cvv TEXT NOT NULL,
-                card_type TEXT NOT NULL,
-                card_network TEXT NOT NULL,
-                family_member TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        ''')
-
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+
+            # Create settings table for password hash
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+
+            cursor.execute(_CREATE_CARDS_SQL.format(table='bank_cards'))
+            self._migrate(cursor)
+
+            # Lets the ORDER BY created_at_ns DESC listings walk an index instead of sorting
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_cards_created_at_ns ON bank_cards(created_at_ns DESC)')
+
+    def _migrate(self, cursor: sqlite3.Cursor) -> None:
+        """Bring an existing database up to the current schema version"""
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+
+        if version < 1:
+            # Version 1 stores created/updated times as INTEGER nanoseconds since the
+            # epoch instead of ISO TEXT. Tables from before that are rebuilt, converting
+            # in Python because the stored ISO strings are in local time.
+            columns = {row['name'] for row in cursor.execute('PRAGMA table_info(bank_cards)')}
+            cursor.execute('BEGIN')
+            try:
+                if 'created_at' in columns:
+                    cursor.execute(_CREATE_CARDS_SQL.format(table='bank_cards_new'))
+                    rows = cursor.execute('SELECT * FROM bank_cards').fetchall()
+                    cursor.executemany('''
+                        INSERT INTO bank_cards_new
+                        (id, bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+                         validity_start, validity_end, cvv, card_type, card_network,
+                         family_member, created_at_ns, updated_at_ns)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', [
+                        tuple(row[column] for column in _CARD_COLUMNS[:-2])
+                        + (_iso_to_ns(row['created_at']), _iso_to_ns(row['updated_at']))
+                        for row in rows
+                    ])
+                    # Keep AUTOINCREMENT from reusing the IDs of deleted cards
+                    sequence = cursor.execute(
+                        "SELECT seq FROM sqlite_sequence WHERE name = 'bank_cards'").fetchone()
+                    cursor.execute('DROP TABLE bank_cards')
+                    cursor.execute('ALTER TABLE bank_cards_new RENAME TO bank_cards')
+                    if sequence:
+                        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'bank_cards'",
+                                       (sequence[0],))
+                        # An empty table never got a sequence row of its own
+                        if cursor.rowcount == 0:
+                            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('bank_cards', ?)",
+                                           (sequence[0],))
+                cursor.execute('PRAGMA user_version = 1')
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+
+    def _get_setting(self, key: str) -> str | None:
+        """Read a value from the settings table"""
+        cursor = self._reader().cursor()
+        cursor.execute(_GET_SETTING_SQL, (key,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+    def _put_settings(self, values: dict) -> None:
+        """Write several settings in one transaction"""
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(_PUT_SETTING_SQL, values.items())
 
     def is_setup_complete(self) -> bool:
         """Check if master password is set"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM settings WHERE key = "password_hash"')
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
+        return self._get_setting('password_hash') is not None
 
     def set_master_password(self, password: str) -> None:
         """Set master password"""
-        salt = secrets.token_hex(16)
-        # Use PBKDF2 with SHA256, 100,000 iterations
-        password_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        ).hex()
-        stored_value = f"{salt}:{password_hash}"
-
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
-                      ("password_hash", stored_value))
-        conn.commit()
-        conn.close()
+        # argon2id for authentication; the Fernet key gets its own PBKDF2 salt
+        # and iteration count
+        self._put_settings({
+            'password_hash': _password_hasher().hash(password),
+            'encryption_salt': secrets.token_bytes(16).hex(),
+            'encryption_iterations': str(_ENCRYPTION_ITERATIONS),
+            # Everything in a new vault is encrypted from the start
+            'plaintext_migrated': '1',
+        })
+        self._fernet = None
         self.master_password = password
+        # Derive the key now, on the setup thread, rather than on the first card read
+        self._ensure_fernet()
 
     def check_master_password(self, password: str) -> bool:
         """Check if password is correct"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM settings WHERE key = "password_hash"')
-        result = cursor.fetchone()
-        conn.close()
+        stored_value = self._get_setting('password_hash')
 
-        if not result:
+        if not stored_value:
             return False
 
-        salt, stored_hash = result[0].split(':')
-        calculated_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        ).hex()
-
-        if calculated_hash == stored_hash:
-            self.master_password = password
-            return True
-        return False
+        if stored_value.startswith('$argon2'):
+            from argon2.exceptions import VerificationError
+
+            try:
+                _password_hasher().verify(stored_value, password)
+            except VerificationError:
+                return False
+            if _password_hasher().check_needs_rehash(stored_value):
+                self._put_settings({'password_hash': _password_hasher().hash(password)})
+        else:
+            # Legacy "{salt_hex}:{hash_hex}" PBKDF2 hash, 100,000 iterations.
+            # The hex string itself is the KDF salt.
+            salt, stored_hash = stored_value.split(':')
+            calculated_hash = _pbkdf2_sha256(password, salt.encode('utf-8'))
+            if not hmac.compare_digest(calculated_hash, bytes.fromhex(stored_hash)):
+                return False
+
+            # Upgrade to argon2id. Existing card data was encrypted with a key salted
+            # by the legacy hash's salt string, so keep its bytes as the encryption salt.
+            self._put_settings({
+                'password_hash': _password_hasher().hash(password),
+                'encryption_salt': salt.encode('utf-8').hex(),
+            })
+
+        self._fernet = None
+        self.master_password = password
+        # Derive the key now, on the login thread, rather than on the first card read.
+        # The password is verified, so the key is right for encrypting leftover plain text.
+        self._ensure_fernet()
+        self.migrate_legacy_plaintext()
+        return True
 
-    def _get_encryption_key(self) -> bytes:
-        """Derive encryption key from master password"""
-        if not self.master_password:
-            raise ValueError("Master password not set or logged in")
+    def set_master_password_async(self, password: str) -> 'Future':
+        """Set master password on a background thread"""
+        return _kdf_executor().submit(self.set_master_password, password)
 
-        # We need a consistent salt for the encryption key.
-        # Ideally stored in DB, but for now we'll use the password hash's salt if available,
-        # or a fixed system salt if we want to separate auth from encryption (better).
-        # However, to avoid schema changes for a new 'encryption_salt', we'll read the auth salt.
+    def check_master_password_async(self, password: str) -> 'Future':
+        """Check password on a background thread; the Future resolves to the result"""
+        return _kdf_executor().submit(self.check_master_password, password)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM settings WHERE key = "password_hash"')
-        result = cursor.fetchone()
-        conn.close()
+    def _ensure_fernet(self) -> 'Fernet':
+        """Get the Fernet cipher for the logged-in master password, deriving it once"""
+        if self._fernet is not None:
+            return self._fernet
 
-        if not result:
-             raise ValueError("Setup not complete")
+        # Imported on first use, like openpyxl, so starting the app doesn't load
+        # cryptography's native backend before anyone has logged in
+        from cryptography.fernet import Fernet
 
-        salt_hex = result[0].split(':')[0]
-        salt = salt_hex.encode('utf-8') # Using the hex string as bytes for KDF salt
+        if not self.master_password:
+            raise ValueError("Master password not set or logged in")
 
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(self.master_password.encode()))
-        return key
+        salt_hex = self._get_setting('encryption_salt')
+        if salt_hex is not None:
+            salt = bytes.fromhex(salt_hex)
+        else:
+            # Vaults that predate argon2 salt the key with the PBKDF2 hash's salt,
+            # using the hex string itself as the salt bytes
+            password_hash = self._get_setting('password_hash')
+            if not password_hash:
+                raise ValueError("Setup not complete")
+            salt = password_hash.split(':')[0].encode('utf-8')
+        # Vaults without the setting were keyed with the original 100,000 iterations
+        iterations = int(self._get_setting('encryption_iterations') or 100_000)
+
+        key = base64.urlsafe_b64encode(_pbkdf2_sha256(self.master_password, salt, iterations))
+        self._fernet = Fernet(key)
+        return self._fernet
+
+    def logout(self) -> None:
+        """Forget the master password and the key derived from it"""
+        self.master_password = None
+        self._fernet = None
 
     def encrypt_data(self, data: str) -> str:
         """Encrypt string data"""
         if not data:
             return ""
-        f = Fernet(self._get_encryption_key())
-        return f.encrypt(data.encode()).decode()
+        return self._ensure_fernet().encrypt(data.encode()).decode()
 
     def decrypt_data(self, encrypted_data: str) -> str:
         """Decrypt string data"""
-        if not encrypted_data:
-            return ""
+        from cryptography.fernet import InvalidToken
+
         try:
-            f = Fernet(self._get_encryption_key())
-            return f.decrypt(encrypted_data.encode()).decode()
-        except Exception:
-            # Fallback for legacy plain text data if migration happened
+            return self._fast_decrypt(encrypted_data)
+        except InvalidToken:
+            # Fallback for legacy plain text data not yet migrated
             return encrypted_data
 
-    def mask_card_number(self, card_number: str) -> str:
+    def _fast_decrypt(self, encrypted_data: str) -> str:
+        """Decrypt string data known to be Fernet ciphertext"""
+        if not encrypted_data:
+            return ""
+        return self._ensure_fernet().decrypt(encrypted_data.encode()).decode()
+
+    def _card_decryptor(self) -> Callable[[str], str]:
+        """Pick the decrypt function for card reads.
+
+        Once migrate_legacy_plaintext has run, every stored value is Fernet
+        ciphertext and reads skip the plain text fallback.
+        """
+        if self._get_setting('plaintext_migrated'):
+            return self._fast_decrypt
+        return self.decrypt_data
+
+    def migrate_legacy_plaintext(self) -> int:
+        """Encrypt sensitive card fields still stored as plain text.
+
+        Runs once per vault, after check_master_password has verified the
+        password; returns the number of cards updated. Only values that are not
+        shaped like a Fernet token are encrypted. If a token fails to decrypt,
+        nothing is written and the vault stays unmigrated.
+        """
+        if self._get_setting('plaintext_migrated'):
+            return 0
+
+        from cryptography.fernet import InvalidToken
+
+        fernet = self._ensure_fernet()
+        updates = []
+        with self._lock:
+            for row in self._conn.execute(_SELECT_SECRETS_SQL).fetchall():
+                values = []
+                for value in (row['account_number'], row['atm_number'], row['pin'], row['cvv']):
+                    if value and _is_fernet_token(value):
+                        try:
+                            fernet.decrypt(value.encode())
+                        except InvalidToken:
+                            _logger().warning("Card %d has ciphertext this key can't decrypt; "
+                                              "leaving legacy plain text unmigrated", row['id'])
+                            return 0
+                    elif value:
+                        value = fernet.encrypt(value.encode()).decode()
+                    values.append(value)
+                if values != [row['account_number'], row['atm_number'], row['pin'], row['cvv']]:
+                    updates.append((*values, row['id']))
+
+            with self._conn:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(_UPDATE_SECRETS_SQL, updates)
+                self._conn.execute(_PUT_SETTING_SQL, ('plaintext_migrated', '1'))
+        return len(updates)
+
+    @staticmethod
+    def mask_card_number(card_number: str) -> str:
         """Mask card number"""
         if len(card_number) >= 16:
-            return f"{card_number[:4]} **** **** {card_number[-4:]}"
-        return "**** **** **** ****"
+            return card_number[:4] + _MASK_MID + card_number[-4:]
+        return _MASK_FULL
 
-    def mask_cvv(self, cvv: str) -> str:
+    @staticmethod
+    def mask_cvv(cvv: str) -> str:
         """Mask CVV"""
         if len(cvv) == 3:
             return "***"
@@ -172,120 +537,75 @@ class CompleteDatabase:
     def add_card(self, bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
                  validity_start, validity_end, cvv, card_type, card_network, family_member) -> int:
         """Add new bank card"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        now = datetime.now().isoformat()
+        row = self._prepare_row(
+            bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+            validity_start, validity_end, cvv, card_type, card_network, family_member,
+            time.time_ns()
+        )
 
-        # Encrypt sensitive fields
-        enc_account = self.encrypt_data(account_number)
-        enc_atm = self.encrypt_data(atm_number)
-        enc_pin = self.encrypt_data(pin)
-        enc_cvv = self.encrypt_data(cvv)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_INSERT_SQL, row)
+            card_id = cursor.lastrowid
+        return card_id
 
-        cursor.execute('''
-            INSERT INTO bank_cards
-            (bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
-             validity_start, validity_end, cvv, card_type, card_network,
-             family_member, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            bank_name, branch_name, ifsc_code, enc_account, enc_atm, enc_pin,
-            validity_start, validity_end, enc_cvv, card_type, card_network,
+    def _prepare_row(self, bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
+                     validity_start, validity_end, cvv, card_type, card_network, family_member,
+                     now) -> tuple:
+        """Build the _INSERT_SQL parameters for a card, encrypting sensitive fields"""
+        return (
+            bank_name, branch_name, ifsc_code,
+            self.encrypt_data(account_number), self.encrypt_data(atm_number), self.encrypt_data(pin),
+            validity_start, validity_end, self.encrypt_data(cvv), card_type, card_network,
             family_member, now, now
-        ))
-
-        card_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return card_id
+        )
 
     def get_all_cards(self) -> list[dict]:
         """Get all cards with masked sensitive data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT id, bank_name, branch_name, ifsc_code, account_number, atm_number,
-                   pin, validity_start, validity_end, cvv, card_type, card_network,
-                   family_member, created_at, updated_at
-            FROM bank_cards
-            ORDER BY created_at DESC
-        ''')
-
-        cards = []
-        for row in cursor.fetchall():
-            # Decrypt fields first
-            dec_account = self.decrypt_data(row[4])
-            dec_atm = self.decrypt_data(row[5])
-            dec_pin = self.decrypt_data(row[6])
-            dec_cvv = self.decrypt_data(row[9])
-
-            card_data = {
-                'id': row[0],
-                'bank_name': row[1],
-                'branch_name': row[2],
-                'ifsc_code': row[3],
-                'account_number': self.mask_card_number(dec_account),
-                'atm_number': self.mask_card_number(dec_atm),
-                'pin': self.mask_cvv(dec_pin),
-                'validity_start': row[7],
-                'validity_end': row[8],
-                'cvv': self.mask_cvv(dec_cvv),
-                'card_type': row[10],
-                'card_network': row[11],
-                'family_member': row[12],
-                'created_at': row[13],
-                'updated_at': row[14]
-            }
-            cards.append(card_data)
-
-        conn.close()
-        return cards
+        return list(self._iter_cards(mask=True))
+
+    def _iter_cards(self, mask: bool) -> Iterator[dict]:
+        """Yield every card decrypted, newest first, optionally masking sensitive fields"""
+        # Bind the helpers once instead of looking them up for every field of every row
+        decrypt = self._card_decryptor()
+        cursor = self._reader().execute(_SELECT_ALL_SQL)
+
+        if mask:
+            mask_number, mask_code = self.mask_card_number, self.mask_cvv
+        else:
+            mask_number = mask_code = lambda value: value
+
+        # Step the cursor row by row so the raw result set is never held in memory at once
+        for row in cursor:
+            card_data = dict(row)
+            card_data['account_number'] = mask_number(decrypt(row['account_number']))
+            card_data['atm_number'] = mask_number(decrypt(row['atm_number']))
+            card_data['pin'] = mask_code(decrypt(row['pin']))
+            card_data['cvv'] = mask_code(decrypt(row['cvv']))
+            card_data['created_at'] = _ns_to_iso(row['created_at'])
+            card_data['updated_at'] = _ns_to_iso(row['updated_at'])
+            yield card_data
 
     def get_card_by_id(self, card_id: int) -> dict | None:
         """Get card by ID for editing"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT id, bank_name, branch_name, ifsc_code, account_number, atm_number,
-                   pin, validity_start, validity_end, cvv, card_type, card_network,
-                   family_member, created_at, updated_at
-            FROM bank_cards WHERE id = ?
-        ''', (card_id,))
-
+        cursor = self._reader().execute(_SELECT_BY_ID_SQL, (card_id,))
         row = cursor.fetchone()
-        conn.close()
 
         if row:
-            return {
-                'id': row[0],
-                'bank_name': row[1],
-                'branch_name': row[2],
-                'ifsc_code': row[3],
-                'account_number': self.decrypt_data(row[4]),
-                'atm_number': self.decrypt_data(row[5]),
-                'pin': self.decrypt_data(row[6]),
-                'validity_start': row[7],
-                'validity_end': row[8],
-                'cvv': self.decrypt_data(row[9]),
-                'card_type': row[10],
-                'card_network': row[11],
-                'family_member': row[12],
-                'created_at': row[13],
-                'updated_at': row[14]
-            }
+            card_data = dict(row)
+            decrypt = self._card_decryptor()
+            for field in ('account_number', 'atm_number', 'pin', 'cvv'):
+                card_data[field] = decrypt(row[field])
+            card_data['created_at'] = _ns_to_iso(row['created_at'])
+            card_data['updated_at'] = _ns_to_iso(row['updated_at'])
+            return card_data
         return None
 
     def update_card(self, card_id, bank_name, branch_name, ifsc_code, account_number,
                    atm_number, pin, validity_start, validity_end, cvv, card_type,
                    card_network, family_member) -> None:
         """Update existing card"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        now = datetime.now().isoformat()
+        now = time.time_ns()
 
         # Encrypt sensitive fields
         enc_account = self.encrypt_data(account_number)
@@ -293,86 +613,38 @@ class CompleteDatabase:
         enc_pin = self.encrypt_data(pin)
         enc_cvv = self.encrypt_data(cvv)
 
-        cursor.execute('''
-            UPDATE bank_cards
-            SET bank_name=?, branch_name=?, ifsc_code=?, account_number=?, atm_number=?,
-                pin=?, validity_start=?, validity_end=?, cvv=?, card_type=?,
-                card_network=?, family_member=?, updated_at=?
-            WHERE id=?
-        ''', (
-            bank_name, branch_name, ifsc_code, enc_account, enc_atm, enc_pin,
-            validity_start, validity_end, enc_cvv, card_type, card_network,
-            family_member, now, card_id
-        ))
-
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_UPDATE_SQL, (
+                bank_name, branch_name, ifsc_code, enc_account, enc_atm, enc_pin,
+                validity_start, validity_end, enc_cvv, card_type, card_network,
+                family_member, now, card_id
+            ))
 
     def delete_card(self, card_id: int) -> None:
         """Delete card by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('DELETE FROM bank_cards WHERE id = ?', (card_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_DELETE_SQL, (card_id,))
 
     def get_all_cards_unmasked(self) -> list[dict]:
         """Get all cards with unmasked sensitive data for export"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT id, bank_name, branch_name, ifsc_code, account_number, atm_number,
-                   pin, validity_start, validity_end, cvv, card_type, card_network,
-                   family_member, created_at, updated_at
-            FROM bank_cards
-            ORDER BY created_at DESC
-        ''')
-
-        cards = []
-        for row in cursor.fetchall():
-            # Decrypt fields
-            dec_account = self.decrypt_data(row[4])
-            dec_atm = self.decrypt_data(row[5])
-            dec_pin = self.decrypt_data(row[6])
-            dec_cvv = self.decrypt_data(row[9])
-
-            card_data = {
-                'id': row[0],
-                'bank_name': row[1],
-                'branch_name': row[2],
-                'ifsc_code': row[3],
-                'account_number': dec_account,  # Unmasked
-                'atm_number': dec_atm,      # Unmasked
-                'pin': dec_pin,             # Unmasked
-                'validity_start': row[7],
-                'validity_end': row[8],
-                'cvv': dec_cvv,             # Unmasked
-                'card_type': row[10],
-                'card_network': row[11],
-                'family_member': row[12],
-                'created_at': row[13],
-                'updated_at': row[14]
-            }
-            cards.append(card_data)
-
-        conn.close()
-        return cards
+        return list(self._iter_cards(mask=False))
 
     def export_to_excel(self, filename: str) -> int:
         """Export cards to Excel file"""
         # Note: This requires openpyxl installed
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment
         from openpyxl.utils import get_column_letter
 
         cards = self.get_all_cards_unmasked()
 
-        # Create a new workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Bank Cards"
+        # Create a streaming workbook: rows are written out as they are appended
+        # instead of being held as Cell objects until save
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Bank Cards")
 
         # Define headers
         headers = [
@@ -381,71 +653,50 @@ class CompleteDatabase:
             "Card Type", "Card Network", "Family Member", "Created At", "Updated At"
         ]
 
+        # Auto-adjust column widths; write-only sheets need them before the first row
+        col_widths = [len(header) for header in headers]
+        for card in cards:
+            for i, key in enumerate(_CARD_COLUMNS):
+                width = len(str(card[key]))
+                if width > col_widths[i]:
+                    col_widths[i] = width
+        for col, width in enumerate(col_widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = min(width + 2, 50)
+
         # Style for headers
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
         header_alignment = Alignment(horizontal="center", vertical="center")
 
         # Add headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
 
-        # Add data rows
-        for row, card in enumerate(cards, 2):
-            ws.cell(row=row, column=1, value=card['id'])
-            ws.cell(row=row, column=2, value=card['bank_name'])
-            ws.cell(row=row, column=3, value=card['branch_name'])
-            ws.cell(row=row, column=4, value=card['ifsc_code'])
-            ws.cell(row=row, column=5, value=card['account_number'])
-            ws.cell(row=row, column=6, value=card['atm_number'])
-            ws.cell(row=row, column=7, value=card['pin'])
-            ws.cell(row=row, column=8, value=card['validity_start'])
-            ws.cell(row=row, column=9, value=card['validity_end'])
-            ws.cell(row=row, column=10, value=card['cvv'])
-            ws.cell(row=row, column=11, value=card['card_type'])
-            ws.cell(row=row, column=12, value=card['card_network'])
-            ws.cell(row=row, column=13, value=card['family_member'])
-            ws.cell(row=row, column=14, value=card['created_at'])
-            ws.cell(row=row, column=15, value=card['updated_at'])
-
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        # Add data rows; card keys follow the header column order
+        for card in cards:
+            ws.append([card[key] for key in _CARD_COLUMNS])
 
         # Add summary sheet
         summary_ws = wb.create_sheet("Summary")
-        summary_ws['A1'] = "Bank Cards Export Summary"
-        summary_ws['A1'].font = Font(bold=True, size=14)
+        title_cell = WriteOnlyCell(summary_ws, value="Bank Cards Export Summary")
+        title_cell.font = Font(bold=True, size=14)
+        summary_ws.append([title_cell])
+        summary_ws.append([])
 
-        summary_ws['A3'] = "Export Date:"
-        summary_ws['B3'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        summary_ws.append(["Export Date:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+        summary_ws.append(["Total Cards:", len(cards)])
+        summary_ws.append([])
 
-        summary_ws['A4'] = "Total Cards:"
-        summary_ws['B4'] = len(cards)
-
-        summary_ws['A6'] = "Card Types:"
-        card_types = {}
-        for card in cards:
-            card_type = card['card_type']
-            card_types[card_type] = card_types.get(card_type, 0) + 1
-
-        row = 7
-        for card_type, count in card_types.items():
-            summary_ws[f'A{row}'] = f"{card_type}:"
-            summary_ws[f'B{row}'] = count
-            row += 1
+        summary_ws.append(["Card Types:"])
+        card_types = Counter(card['card_type'] for card in cards)
+        for card_type, count in card_types.most_common():
+            summary_ws.append([f"{card_type}:", count])
 
         # Save the workbook
         wb.save(filename)
@@ -455,63 +706,26 @@ class CompleteDatabase:
         """Import cards from Excel file"""
         from openpyxl import load_workbook
         try:
-            wb = load_workbook(filename, data_only=True)
+            wb = load_workbook(filename, data_only=True, read_only=True)
             ws = wb.active
 
-            imported_count = 0
-            skipped_count = 0
+            raw_rows = list(ws.iter_rows(min_row=2, max_col=13, values_only=True))
+            # Read-only workbooks keep the file open until closed
+            wb.close()
 
             # Skip header row, start from row 2
-            for row in range(2, ws.max_row + 1):
-                try:
-                    # Read data from Excel
-                    bank_name = str(ws.cell(row=row, column=2).value or "").strip()
-                    branch_name = str(ws.cell(row=row, column=3).value or "").strip()
-                    ifsc_code = str(ws.cell(row=row, column=4).value or "").strip()
-                    account_number = str(ws.cell(row=row, column=5).value or "").strip()
-                    atm_number = str(ws.cell(row=row, column=6).value or "").strip()
-                    pin = str(ws.cell(row=row, column=7).value or "").strip()
-                    validity_start = str(ws.cell(row=row, column=8).value or "").strip()
-                    validity_end = str(ws.cell(row=row, column=9).value or "").strip()
-                    cvv = str(ws.cell(row=row, column=10).value or "").strip()
-                    card_type = str(ws.cell(row=row, column=11).value or "Debit").strip()
-                    card_network = str(ws.cell(row=row, column=12).value or "RuPay").strip()
-                    family_member = str(ws.cell(row=row, column=13).value or "").strip()
-
-                    # Validate required fields
-                    if not all([bank_name, branch_name, ifsc_code, account_number, atm_number, pin, cvv, validity_start, validity_end, family_member]):
-                        skipped_count += 1
-                        continue
-
-                    # Clean account and ATM numbers (remove spaces)
-                    account_number = ''.join(filter(str.isdigit, account_number))
-                    atm_number = ''.join(filter(str.isdigit, atm_number))
-
-                    # Validate ATM number length
-                    if len(atm_number) != 16:
-                        skipped_count += 1
-                        continue
-
-                    # Validate date format
-                    try:
-                        datetime.strptime(validity_start, "%Y-%m-%d")
-                        datetime.strptime(validity_end, "%Y-%m-%d")
-                    except ValueError:
-                        skipped_count += 1
-                        continue
-
-                    # Add card to database
-                    self.add_card(
-                        bank_name, branch_name, ifsc_code, account_number, atm_number, pin,
-                        validity_start, validity_end, cvv, card_type, card_network, family_member
-                    )
-                    imported_count += 1
-
-                except Exception as e:
-                    skipped_count += 1
-                    continue
-
-            return imported_count, skipped_count
+            valid_rows, skipped_indices = _validate_rows(raw_rows, start=2)
+
+            # One timestamp for the whole import: every card in it is created together
+            now = time.time_ns()
+            rows = [self._prepare_row(*card, now) for card in valid_rows]
+
+            # Insert every valid row in one transaction so the import commits once
+            with self._lock, self._conn:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(_INSERT_SQL, rows)
+
+            return len(rows), len(skipped_indices)
 
         except Exception as e:
             raise Exception(f"Failed to import Excel file: {e}")
@@ -527,7 +741,16 @@ class CompleteDatabase:
             'cards': cards
         }
 
-        with open(filename, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        # Imported here, like openpyxl, so only exports pay for loading a serializer.
+        # orjson is optional and serializes in native code, several times faster than json.
+        try:
+            import orjson
+        except ImportError:
+            import json
+            with open(filename, 'w') as f:
+                json.dump(export_data, f, indent=2)
+        else:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
 
         return len(cards)
@@ -16,6 +16,7 @@ class LoginWindow:
         self.center_window(self.root)
         
         self.database = None
+        self.pending_login = None
         self.create_widgets()
     
     def center_window(self, window: tk.Tk | tk.Toplevel) -> None:
@@ -57,33 +58,52 @@ class LoginWindow:
         self.password_entry.focus()
         
         # Login button
-        login_btn = ttk.Button(password_frame, text=btn_text, command=self.login)
-        login_btn.pack(pady=10)
+        self.login_btn = ttk.Button(password_frame, text=btn_text, command=self.login)
+        self.login_btn.pack(pady=10)
         
         # Bind Enter key
         self.password_entry.bind('<Return>', lambda e: self.login())
     
     def login(self) -> None:
         """Handle login"""
+        if self.pending_login is not None:
+            return
+        
         password = self.password_entry.get()
         
         if len(password) < 8:
             messagebox.showerror("Error", "Password must be at least 8 characters long!")
             return
         
+        # Hash the password in the background so the window stays responsive
+        if not self.is_setup:
+            self.pending_login = self.database.set_master_password_async(password)
+        else:
+            self.pending_login = self.database.check_master_password_async(password)
+        self.login_btn.state(['disabled'])
+        self.root.after(50, self.finish_login)
+    
+    def finish_login(self) -> None:
+        """Complete login once the background password check is done"""
+        if not self.pending_login.done():
+            self.root.after(50, self.finish_login)
+            return
+        
+        future, self.pending_login = self.pending_login, None
+        self.login_btn.state(['!disabled'])
+        
         try:
-            if not self.is_setup:
-                self.database.set_master_password(password)
-                self.root.destroy()
-                self.show_main_window()
-            else:
-                if self.database.check_master_password(password):
-                    self.root.destroy()
-                    self.show_main_window()
-                else:
-                    messagebox.showerror("Error", "Invalid password!")
+            # Always take the result so errors from setting a new password surface too
+            ok = future.result()
+            if self.is_setup and not ok:
+                messagebox.showerror("Error", "Invalid password!")
+                return
         except Exception as e:
             messagebox.showerror("Error", f"Login failed: {e}")
+            return
+        
+        self.root.destroy()
+        self.show_main_window()
     
     def show_main_window(self) -> None:
         """Show main window after login"""
@@ -101,6 +121,8 @@ class MainWindow:
         self.root = tk.Tk()
         self.root.title("Complete Bank Manager")
         self.root.geometry("1000x700")
+        # Closing the window shuts the database down the same way logging out does
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         # Center window
         self.center_window(self.root)
@@ -331,7 +353,13 @@ Valid Until: {card['validity_end']}"""
     def logout(self) -> None:
         """Logout and close application"""
         if messagebox.askyesno("Logout", "Are you sure you want to logout?"):
-            self.root.destroy()
+            self.close()
+    
+    def close(self) -> None:
+        """Forget the key, close the database and the window"""
+        self.database.logout()
+        self.database.close()
+        self.root.destroy()
     
     def run(self) -> None:
         """Run the main window"""